@@ -1,26 +1,25 @@
 #!/usr/bin/env python3
 """Weird festival timer video generator with glitch effects and animations."""
 
-import os
-
-# Force moviepy to use system ffmpeg (which has GPU support) - MUST be before importing moviepy
-os.environ["FFMPEG_BINARY"] = "/usr/bin/ffmpeg"
-
+import sys
 from pathlib import Path
-from moviepy.editor import VideoClip
 import numpy as np
-from PIL import Image, ImageDraw
 import random
 
 from timer_utils import (
     RESOLUTION,
-    BACKGROUND_COLOR,
+    TIME_SLOTS,
+    CORRUPTION_CHOICES,
     TEXT_COLOR,
     format_time,
-    load_digital_font,
-    get_codec_config,
-    corrupt_digit,
-    calculate_weird_time,
+    format_time_fast,
+    render_text_video,
+    encode_text,
+    decode_text,
+    corrupt_codes,
+    apply_corruption,
+    calculate_weird_time_vec,
+    profile,
 )
 
 
@@ -31,40 +30,42 @@ FPS = 25
 ACTUAL_DURATION = 120  # Actual video duration (seconds)
 NUM_JUMPS = 5  # Number of random time jumps (can be overridden)
 NUM_ANIMATIONS = 8  # Number of animation events (can be overridden)
+CORRUPTION_CHANCE = 0.997  # Chance threshold for digit corruption (can be overridden)
 COLOR_GLITCH_CHANCE = 0.998  # Chance threshold for color glitches (can be overridden)
+GLITCH_COLOR = "magenta"
 
 
 def animate_digit_wave(base_time_str: str, wave_progress: float) -> str:
     """Create wave animation through digits."""
-    result = ""
+    result = []
     for i, char in enumerate(base_time_str):
         if char == ":":
-            result += ":"
+            result.append(":")
         else:
             phase = (wave_progress + i * 0.15) % 1.0
             if phase < 0.5:
-                result += char
+                result.append(char)
             else:
-                result += " "
-    return result
+                result.append(" ")
+    return "".join(result)
 
 
 def animate_odd_even(base_time_str: str, anim_progress: float) -> str:
     """Animate odd digits appearing first, then even."""
-    result = ""
+    result = []
     for i, char in enumerate(base_time_str):
         if char == ":":
-            result += ":"
+            result.append(":")
         elif anim_progress < 0.4:
             # Show nothing
-            result += "8" if i % 2 == 1 else " "
+            result.append("8" if i % 2 == 1 else " ")
         elif anim_progress < 0.7:
             # Show odd positions
-            result += "8" if i % 2 == 1 else char
+            result.append("8" if i % 2 == 1 else char)
         else:
             # Show all
-            result += char
-    return result
+            result.append(char)
+    return "".join(result)
 
 
 def animate_segments_snake(t: float) -> str:
@@ -108,49 +109,72 @@ def animate_lightning(anim_progress: float, base_time_str: str) -> str:
 def animate_count_up(anim_progress: float) -> str:
     """Count up rapidly from 00:00."""
     seconds = int(anim_progress * 30)
-    return format_time(seconds)
+    return format_time_fast(seconds)
 
 
 def animate_spinning_digits(anim_progress: float, base_time_str: str) -> str:
     """Each digit spins through numbers before settling."""
-    result = ""
+    result = []
     for i, char in enumerate(base_time_str):
         if char == ":":
-            result += ":"
+            result.append(":")
         elif anim_progress < 0.7:
             # Spin through random numbers
             spin_speed = 10 + i * 2
             digit = int(anim_progress * spin_speed) % 10
-            result += str(digit)
+            result.append(str(digit))
         else:
             # Settle to actual value
-            result += char
-    return result
-
-
-def generate_timer_video(output_path: str = "output/timer_test.mp4"):
-    """Generate a countdown timer video."""
-
-    font = load_digital_font()
-
-    # Calculate center position
-    center_x = RESOLUTION[0] // 2
-    center_y = RESOLUTION[1] // 2
-
-    # Track accumulated time for weird time calculations
-    accumulated_time = [random.uniform(30, 180)]  # Start at random time!
-    last_t = [0.0]
-
-    # Track corruption state: {position: (corrupted_char, expiry_time)}
-    corruption_state = {}
-
-    # Track color state per character: {position: (color, expiry_time)}
-    color_state = {}
-
-    # Track animation states
-    animation_mode = [None]
-    animation_start_time = [0.0]
-    animation_duration = [0.0]
+            result.append(char)
+    return "".join(result)
+
+
+ANIMATION_MODES = [
+    "wave",
+    "odd_even",
+    "all_eights",
+    "segments_snake",
+    "lightning",
+    "count_up",
+    "spinning",
+]
+
+
+def apply_animation(mode, anim_progress: float, time_str: str, t: float) -> str:
+    """Return the string shown for an animation frame (time_str when mode is None)."""
+    if mode == "wave":
+        time_str = animate_digit_wave(time_str, anim_progress * 3)
+    elif mode == "odd_even":
+        time_str = animate_odd_even(time_str, anim_progress)
+    elif mode == "all_eights":
+        if anim_progress < 0.4:
+            time_str = "88:88"
+        elif anim_progress < 0.7:
+            # Gradually reveal
+            reveal = int((anim_progress - 0.4) / 0.3 * len(time_str))
+            time_str = time_str[:reveal] + "8" * (len(time_str) - reveal)
+    elif mode == "segments_snake":
+        time_str = animate_segments_snake(t)
+    elif mode == "lightning":
+        time_str = animate_lightning(anim_progress, time_str)
+    elif mode == "count_up":
+        time_str = animate_count_up(anim_progress)
+    elif mode == "spinning":
+        time_str = animate_spinning_digits(anim_progress, time_str)
+    return time_str
+
+
+def build_timeline(frame_times: np.ndarray):
+    """Precompute displayed time and animation state for every frame.
+
+    Returns (remaining, anim_modes, anim_progress, frame_events) where remaining is
+    the displayed time per frame, anim_modes/anim_progress hold the active animation
+    (or None) and its 0-1 progress, and frame_events maps a frame index to the log
+    messages for the jumps/animations starting on it.
+    """
+    n_frames = len(frame_times)
+    frame_events = {}
+    start_time = random.uniform(30, 180)  # Start at random time!
 
     # Random jump schedule
     jump_times = (
@@ -167,165 +191,124 @@ def generate_timer_video(output_path: str = "output/timer_test.mp4"):
         else []
     )
 
-    def make_frame(t):
-        """Generate a frame at time t with glitch effects."""
-        progress = t / ACTUAL_DURATION
-
-        # Random time jumps!
-        for i, jump_t in enumerate(jump_times):
-            if last_t[0] < jump_t <= t:
-                accumulated_time[0] = jump_targets[i]
-                print(f"  ⚡ Time jump at {t:.1f}s -> {format_time(jump_targets[i])}")
-
-        # Trigger animations
-        for i, anim_t in enumerate(anim_times):
-            if last_t[0] < anim_t <= t and animation_mode[0] is None:
-                modes = [
-                    "wave",
-                    "odd_even",
-                    "all_eights",
-                    "segments_snake",
-                    "lightning",
-                    "count_up",
-                    "spinning",
-                ]
-                animation_mode[0] = random.choice(modes)
-                animation_start_time[0] = t
-                animation_duration[0] = random.uniform(2, 5)
-                print(f"  🎬 Animation '{animation_mode[0]}' started at {t:.1f}s")
-
-        # Check if animation expired
-        if animation_mode[0] and (t - animation_start_time[0]) > animation_duration[0]:
-            animation_mode[0] = None
-
-        # Calculate weird time progression
-        dt = t - last_t[0]
-        last_t[0] = t
-
-        speed = calculate_weird_time(t, ACTUAL_DURATION)
-        accumulated_time[0] += dt * speed
-
-        # Calculate displayed time (counting down)
-        visual_time = accumulated_time[0]
-        remaining_time = max(0, visual_time % 600)  # Wrap around at 10 minutes
-
-        time_str = format_time(remaining_time)
-
-        # Apply animations if active
-        if animation_mode[0]:
-            anim_progress = (t - animation_start_time[0]) / animation_duration[0]
-
-            if animation_mode[0] == "wave":
-                time_str = animate_digit_wave(time_str, anim_progress * 3)
-            elif animation_mode[0] == "odd_even":
-                time_str = animate_odd_even(time_str, anim_progress)
-            elif animation_mode[0] == "all_eights":
-                if anim_progress < 0.4:
-                    time_str = "88:88"
-                elif anim_progress < 0.7:
-                    # Gradually reveal
-                    reveal = int((anim_progress - 0.4) / 0.3 * len(time_str))
-                    actual = format_time(remaining_time)
-                    time_str = actual[:reveal] + "8" * (len(actual) - reveal)
-            elif animation_mode[0] == "segments_snake":
-                time_str = animate_segments_snake(t)
-            elif animation_mode[0] == "lightning":
-                time_str = animate_lightning(anim_progress, format_time(remaining_time))
-            elif animation_mode[0] == "count_up":
-                time_str = animate_count_up(anim_progress)
-            elif animation_mode[0] == "spinning":
-                time_str = animate_spinning_digits(anim_progress, format_time(remaining_time))
-
-        # Apply persistent digit corruption
-        corrupted_str = ""
-        for i, char in enumerate(time_str):
-            # Check if this position has active corruption
-            if i in corruption_state and t < corruption_state[i][1]:
-                # Use existing corruption
-                corrupted_str += corruption_state[i][0]
-            else:
-                # Try to create new corruption
-                corrupted_char = corrupt_digit(char)
-                if corrupted_char != char:
-                    # New corruption created, store it with expiry time
-                    duration = random.uniform(0.3, 2.5)  # Last 0.3-2.5 seconds
-                    corruption_state[i] = (corrupted_char, t + duration)
-                    corrupted_str += corrupted_char
-                else:
-                    # No corruption
-                    if i in corruption_state:
-                        del corruption_state[i]
-                    corrupted_str += char
-
-        # Create image with PIL
-        img = Image.new("RGB", RESOLUTION, color=BACKGROUND_COLOR)
-        draw = ImageDraw.Draw(img)
-
-        # Get full text bbox
-        full_bbox = draw.textbbox((center_x, center_y), corrupted_str, font=font, anchor="mm")
-        full_width = full_bbox[2] - full_bbox[0]
-        start_x = center_x - full_width // 2
-
-        current_x = start_x
-        for i, char in enumerate(corrupted_str):
-            # Determine color for this character
-            char_color = TEXT_COLOR
-
-            # Check if this position has active color change
-            if i in color_state and t < color_state[i][1]:
-                char_color = color_state[i][0]
-            elif random.random() > COLOR_GLITCH_CHANCE:  # Configurable chance
-                new_color = "magenta"
-                duration = random.uniform(1.0, 3.0)
-                color_state[i] = (new_color, t + duration)
-                char_color = new_color
-
-            # Draw this character (skip if space from animation)
-            if char != " ":
-                draw.text((current_x, center_y), char, font=font, fill=char_color, anchor="lm")
-
-            # Move to next character position
-            char_bbox = draw.textbbox((0, 0), char if char != " " else "0", font=font)
-            char_width = char_bbox[2] - char_bbox[0]
-            current_x += char_width
-
-        return np.array(img)
-
-    # Create video
-    video = VideoClip(make_frame=make_frame, duration=ACTUAL_DURATION)
-    video = video.set_fps(FPS)
+    # Integrate weird speed over the timeline
+    dt = np.diff(frame_times, prepend=0.0)
+    increments = dt * calculate_weird_time_vec(frame_times, ACTUAL_DURATION)
+    accumulated = start_time + np.cumsum(increments)
+
+    # Both schedules are sorted, so every event's first frame comes from one batched
+    # lookup instead of scanning the event lists frame by frame
+    jump_frames = np.searchsorted(frame_times, jump_times)
+    anim_frames = np.searchsorted(frame_times, anim_times)
+
+    # Random time jumps reset the accumulator on the first frame at or after them
+    for idx, target in zip(jump_frames.tolist(), jump_targets):
+        if idx < n_frames:
+            accumulated[idx:] += target + increments[idx] - accumulated[idx]
+            frame_events.setdefault(idx, []).append(
+                f"  ⚡ Time jump at {frame_times[idx]:.1f}s -> {format_time(target)}"
+            )
+
+    # Displayed time (counting down), wrap around at 10 minutes
+    remaining = np.maximum(0, np.mod(accumulated, 600))
+
+    # Animations only trigger while no other animation is running
+    anim_modes = [None] * n_frames
+    anim_progress = np.zeros(n_frames)
+    expiry_frame = -1  # Frame on which the running animation gets cleared
+    for start in anim_frames.tolist():
+        if start >= n_frames or start <= expiry_frame:
+            continue
+        mode = random.choice(ANIMATION_MODES)
+        duration = random.uniform(2, 5)
+        elapsed = frame_times[start:] - frame_times[start]
+        end = start + int(np.searchsorted(elapsed, duration, side="right"))
+        anim_modes[start:end] = [mode] * (end - start)
+        anim_progress[start:end] = elapsed[: end - start] / duration
+        expiry_frame = end
+        frame_events.setdefault(start, []).append(
+            f"  🎬 Animation '{mode}' started at {frame_times[start]:.1f}s"
+        )
+
+    return remaining, anim_modes, anim_progress, frame_events
+
+
+def resolve_glitches(display_strs, frame_times: np.ndarray) -> list:
+    """Apply persistent digit corruption and color glitches to every frame.
+
+    Returns one (corrupted_str, char_colors) render spec per frame.
+    """
+    n_frames = len(display_strs)
+
+    # Draw every per-character glitch roll for the whole video in one go
+    rng = np.random.default_rng()
+    corrupt_rolls = rng.random((n_frames, TIME_SLOTS))
+    corrupt_choices = rng.integers(0, CORRUPTION_CHOICES, (n_frames, TIME_SLOTS))
+    corrupt_durations = rng.uniform(0.3, 2.5, (n_frames, TIME_SLOTS))  # Last 0.3-2.5 seconds
+    color_rolls = rng.random((n_frames, TIME_SLOTS))
+    color_durations = rng.uniform(1.0, 3.0, (n_frames, TIME_SLOTS))
+
+    # Corruption candidates for every frame and position through the lookup table
+    codes = encode_text(display_strs)
+    candidates = corrupt_codes(codes, corrupt_rolls, corrupt_choices, CORRUPTION_CHANCE)
+
+    # Persistent glitch state runs in one ordered pass per effect. A color glitch is a
+    # "corruption" from clean (0) to glitched (1), so both share apply_corruption()
+    codes = apply_corruption(frame_times, codes, candidates, corrupt_durations)
+    clean = np.zeros_like(codes)
+    new_glitches = (color_rolls > COLOR_GLITCH_CHANCE).astype(clean.dtype)  # Configurable chance
+    glitched = apply_corruption(frame_times, clean, new_glitches, color_durations)
+
+    return [
+        (corrupted_str, tuple(GLITCH_COLOR if g else TEXT_COLOR for g in row))
+        for corrupted_str, row in zip(decode_text(codes), glitched.tolist())
+    ]
+
+
+def generate_timer_video(output_path: str = "output/timer_test.mp4", progress=None):
+    """Generate a countdown timer video, calling progress(done, total) per frame if given."""
+
+    # Precompute the whole timeline once: frame index -> time string / animation
+    n_frames = int(np.ceil(ACTUAL_DURATION * FPS))
+    frame_times = np.arange(n_frames) / FPS
+    remaining, anim_modes, anim_progress, frame_events = build_timeline(frame_times)
+
+    # Resolve animations into the final per-frame strings before rendering
+    display_strs = [
+        apply_animation(mode, anim_p, format_time_fast(remaining_time), t)
+        for mode, anim_p, remaining_time, t in zip(
+            anim_modes, anim_progress, remaining, frame_times
+        )
+    ]
+
+    # Glitch state runs sequentially once, rendering then only needs the results
+    frame_specs = resolve_glitches(display_strs, frame_times)
 
     # Ensure output directory exists
     Path(output_path).parent.mkdir(exist_ok=True, parents=True)
 
     print(f"Generating FESTIVAL WEIRD timer video...")
     print(f"  Actual duration: {ACTUAL_DURATION}s")
-    print(f"  Random time jumps: {len(jump_times)}")
-    print(f"  Animations: {len(anim_times)}")
+    print(f"  Random time jumps: {NUM_JUMPS}")
+    print(f"  Animations: {NUM_ANIMATIONS}")
     print(f"  Resolution: {RESOLUTION[0]}x{RESOLUTION[1]}")
     print(f"  Output: {output_path}")
     print(f"  Effects: digit corruption, color glitches, speed variations, reversals, animations!")
 
-    # Configure codec based on GPU availability
-    codec, ffmpeg_params = get_codec_config()
+    # Log the whole event schedule up front, keeping prints off the render path
+    for idx in sorted(frame_events):
+        for message in frame_events[idx]:
+            print(message)
 
-    try:
-        video.write_videofile(
-            output_path, fps=FPS, codec=codec, audio=False, ffmpeg_params=ffmpeg_params
-        )
-    except Exception as e:
-        print(f"GPU encoding failed, falling back to CPU: {e}")
-        codec, ffmpeg_params = get_codec_config(use_gpu=False)
-        video.write_videofile(
-            output_path,
-            fps=FPS,
-            codec=codec,
-            audio=False,
-            ffmpeg_params=ffmpeg_params,
-        )
+    render_text_video(
+        frame_specs, output_path, FPS, colors=(TEXT_COLOR, GLITCH_COLOR), progress=progress
+    )
 
     print(f"✓ Video saved to {output_path}")
 
 
 if __name__ == "__main__":
-    generate_timer_video()
+    if "--profile" in sys.argv:
+        profile(generate_timer_video)
+    else:
+        generate_timer_video()
@@ -1,24 +1,20 @@
 #!/usr/bin/env python3
 """Simple timer video generator."""
 
-import os
-
-# Force moviepy to use system ffmpeg (which has GPU support) - MUST be before importing moviepy
-os.environ["FFMPEG_BINARY"] = "/usr/bin/ffmpeg"
-
+import sys
 from pathlib import Path
-from moviepy.editor import VideoClip
 import numpy as np
-from PIL import Image, ImageDraw
 
 from timer_utils import (
     RESOLUTION,
-    BACKGROUND_COLOR,
     TEXT_COLOR,
-    format_time,
-    load_digital_font,
-    get_codec_config,
-    corrupt_digit,
+    TIME_SLOTS,
+    CORRUPTION_CHOICES,
+    CORRUPTION_TABLE,
+    njit,
+    render_text_video,
+    decode_text,
+    profile,
 )
 
 
@@ -31,6 +27,7 @@ ACTUAL_DURATION = 130  # Actual video duration (seconds)
 JUMP_START = 0.8  # When the time jump happens (0.0-1.0)
 JUMP_AMOUNT = 15  # How many seconds to skip forward instantly
 GLITCH_BEFORE_JUMP = 5  # Start glitching this many seconds before jump
+GLITCH_SEED = None  # Seed for the glitch randomness (None: different glitches every run)
 
 # Calculate rush phase speed automatically
 # Normal phase: 1 second of video = 1 second on timer (1:1)
@@ -45,86 +42,115 @@ remaining_actual_time = ACTUAL_DURATION - jump_time
 RUSH_FACTOR = remaining_display_time / remaining_actual_time if remaining_actual_time > 0 else 1.0
 
 
-def generate_timer_video(output_path: str = "output/jump.mp4"):
-    """Generate a countdown timer video."""
-
-    font = load_digital_font()
+@njit(cache=True)
+def frame_codes(
+    frame_times,
+    jump_time,
+    glitch_before,
+    display_duration,
+    jump_amount,
+    rush_factor,
+    glitch_first,
+    rolls,
+    choices,
+    corruption_table,
+):
+    """Compute the glyph codes (MM:SS with glitches) shown on every frame.
+
+    rolls and choices hold the pre-sampled randomness of the glitch window only,
+    row 0 belonging to frame glitch_first. Settings are passed in rather than read
+    as globals so overridden module constants still apply to the compiled function.
+    """
+    n_frames = len(frame_times)
+    glitch_start = jump_time - glitch_before
+    codes = np.empty((n_frames, TIME_SLOTS), dtype=np.int8)
+
+    # Per-position corruption state: corrupted glyph code and expiry time.
+    # An expiry in the past means the position is clean.
+    corrupt_glyph = np.zeros(TIME_SLOTS, dtype=np.int8)
+    corrupt_expiry = np.zeros(TIME_SLOTS)
+
+    for idx in range(n_frames):
+        t = frame_times[idx]
 
-    # Calculate center position
-    center_x = RESOLUTION[0] // 2
-    center_y = RESOLUTION[1] // 2
-
-    # Track corruption state: {position: (corrupted_char, expiry_time)}
-    corruption_state = {}
-
-    def make_frame(t):
-        """Generate a frame at time t."""
         # Calculate displayed time with jump effect
-        jump_time = JUMP_START * ACTUAL_DURATION
-        glitch_start = jump_time - GLITCH_BEFORE_JUMP
-
         if t < jump_time:
             # Normal speed phase: 1 second of video = 1 second on timer
             visual_time = t
         else:
-            # Rush phase after the jump
-            normal_phase_display = jump_time  # Time counted during normal phase
-            rush_phase_actual = t - jump_time  # Time elapsed in rush phase
-            rush_phase_display = rush_phase_actual * RUSH_FACTOR  # Time counted during rush
-
-            # Add the instant jump
-            visual_time = normal_phase_display + JUMP_AMOUNT + rush_phase_display
-
-        remaining_time = DISPLAY_DURATION - visual_time
-        remaining_time = max(0, remaining_time)
-
-        time_str = format_time(remaining_time)
+            # Rush phase after the jump: instant jump, then faster counting
+            visual_time = jump_time + jump_amount + (t - jump_time) * rush_factor
+        remaining_secs = max(0, int(display_duration - visual_time))
+
+        # MM:SS as glyph codes, digits are their own codes and ":" is 10
+        minutes = remaining_secs // 60
+        seconds = remaining_secs % 60
+        row = codes[idx]
+        row[0] = minutes // 10
+        row[1] = minutes % 10
+        row[2] = 10
+        row[3] = seconds // 10
+        row[4] = seconds % 10
 
         # Apply glitch effect right before the jump with persistent corruption
         if glitch_start <= t < jump_time:
             # Calculate how close we are to the jump (0.0 at start, 1.0 at jump)
-            glitch_intensity = (t - glitch_start) / GLITCH_BEFORE_JUMP
+            glitch_intensity = (t - glitch_start) / glitch_before
 
             # Increase corruption chance as we get closer to jump
             # Start at 99.5% chance (very rare), end at 90% chance (more frequent)
             corruption_chance = 0.995 - (glitch_intensity * 0.095)
 
-            # Apply persistent corruption to each character
-            glitched_str = ""
-            for i, char in enumerate(time_str):
-                # Check if this position has active corruption
-                if i in corruption_state and t < corruption_state[i][1]:
+            for i in range(TIME_SLOTS):
+                if t < corrupt_expiry[i]:
                     # Use existing corruption
-                    glitched_str += corruption_state[i][0]
-                else:
-                    # Try to create new corruption
-                    corrupted_char = corrupt_digit(char, corruption_chance)
-                    if corrupted_char != char:
-                        # New corruption created, store it with expiry time
+                    row[i] = corrupt_glyph[i]
+                elif rolls[idx - glitch_first, i] > corruption_chance:
+                    candidate = corruption_table[row[i], choices[idx - glitch_first, i]]
+                    if candidate != row[i]:
                         # Duration increases as we approach the jump (0.3s to 1.0s)
-                        duration = 0.3 + (glitch_intensity * 0.7)
-                        corruption_state[i] = (corrupted_char, t + duration)
-                        glitched_str += corrupted_char
-                    else:
-                        # No corruption
-                        if i in corruption_state:
-                            del corruption_state[i]
-                        glitched_str += char
-            time_str = glitched_str
+                        corrupt_glyph[i] = candidate
+                        corrupt_expiry[i] = t + 0.3 + (glitch_intensity * 0.7)
+                        row[i] = candidate
         else:
             # Clear corruption state when not in glitch zone
-            corruption_state.clear()
-        img = Image.new("RGB", RESOLUTION, color=BACKGROUND_COLOR)
-        draw = ImageDraw.Draw(img)
-
-        # Draw text centered (anchor='mm' means middle-middle)
-        draw.text((center_x, center_y), time_str, font=font, fill=TEXT_COLOR, anchor="mm")
-
-        return np.array(img)
-
-    # Create video
-    video = VideoClip(make_frame=make_frame, duration=ACTUAL_DURATION)
-    video = video.set_fps(FPS)
+            corrupt_expiry[:] = 0.0
+
+    return codes
+
+
+def generate_timer_video(output_path: str = "output/jump.mp4", progress=None):
+    """Generate a countdown timer video, calling progress(done, total) per frame if given."""
+
+    text_colors = (TEXT_COLOR,) * TIME_SLOTS
+
+    # Phase boundary is fixed for the whole video
+    jump_time = JUMP_START * ACTUAL_DURATION
+
+    # Resolve the displayed string of every frame up front (glitch state is time-ordered),
+    # the frames themselves are then rendered in parallel
+    n_frames = int(np.ceil(ACTUAL_DURATION * FPS))
+    frame_times = np.arange(n_frames) / FPS
+
+    # All glitch randomness is drawn in one go, for the glitch window frames only
+    glitch_first, glitch_end = np.searchsorted(
+        frame_times, (jump_time - GLITCH_BEFORE_JUMP, jump_time)
+    )
+    num_glitch_frames = glitch_end - glitch_first
+    rng = np.random.default_rng(GLITCH_SEED)
+    codes = frame_codes(
+        frame_times,
+        jump_time,
+        GLITCH_BEFORE_JUMP,
+        DISPLAY_DURATION,
+        JUMP_AMOUNT,
+        RUSH_FACTOR,
+        glitch_first,
+        rng.random((num_glitch_frames, TIME_SLOTS)),
+        rng.integers(0, CORRUPTION_CHOICES, (num_glitch_frames, TIME_SLOTS)),
+        CORRUPTION_TABLE,
+    )
+    frame_specs = [(time_str, text_colors) for time_str in decode_text(codes)]
 
     # Ensure output directory exists
     Path(output_path).parent.mkdir(exist_ok=True, parents=True)
@@ -139,26 +165,13 @@ def generate_timer_video(output_path: str = "output/jump.mp4"):
     print(f"  Resolution: {RESOLUTION[0]}x{RESOLUTION[1]}")
     print(f"  Output: {output_path}")
 
-    # Configure codec based on GPU availability
-    codec, ffmpeg_params = get_codec_config()
-
-    try:
-        video.write_videofile(
-            output_path, fps=FPS, codec=codec, audio=False, ffmpeg_params=ffmpeg_params
-        )
-    except Exception as e:
-        print(f"GPU encoding failed, falling back to CPU: {e}")
-        codec, ffmpeg_params = get_codec_config(use_gpu=False)
-        video.write_videofile(
-            output_path,
-            fps=FPS,
-            codec=codec,
-            audio=False,
-            ffmpeg_params=ffmpeg_params,
-        )
+    render_text_video(frame_specs, output_path, FPS, progress=progress)
 
     print(f"✓ Video saved to {output_path}")
 
 
 if __name__ == "__main__":
-    generate_timer_video()
+    if "--profile" in sys.argv:
+        profile(generate_timer_video)
+    else:
+        generate_timer_video()
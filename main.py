@@ -2,22 +2,19 @@
 """Simple timer video generator."""
 
 import os
-
-# Force moviepy to use system ffmpeg (which has GPU support) - MUST be before importing moviepy
-os.environ["FFMPEG_BINARY"] = "/usr/bin/ffmpeg"
-
+import sys
 from pathlib import Path
-from moviepy.editor import VideoClip
 import numpy as np
-from PIL import Image, ImageDraw
 
 from timer_utils import (
     RESOLUTION,
-    BACKGROUND_COLOR,
     TEXT_COLOR,
+    TIME_SLOTS,
     format_time,
     load_digital_font,
-    get_codec_config,
+    render_text_video,
+    write_subtitle_video,
+    profile,
 )
 
 
@@ -29,6 +26,7 @@ DISPLAY_DURATION = 150  # Time shown on the timer (seconds)
 ACTUAL_DURATION = 110  # Actual video duration (seconds)
 ACCELERATION_START = 0.6  # Start accelerating at this percentage (0.0-1.0)
 USE_GRADUAL_ACCELERATION = True  # True = smooth acceleration, False = constant speed change
+RENDER_TEXT_IN_FFMPEG = False  # True = ffmpeg draws the text (libass), Python renders no frames
 
 # Calculate acceleration automatically
 # During normal phase: 1 second of video = 1 second on timer
@@ -52,56 +50,28 @@ ACCELERATION_FACTOR = (
 )
 
 
-def generate_timer_video(output_path: str = "output/timer_test.mp4"):
-    """Generate a countdown timer video."""
-
-    font = load_digital_font()
-
-    # Calculate center position
-    center_x = RESOLUTION[0] // 2
-    center_y = RESOLUTION[1] // 2
-
-    def make_frame(t):
-        """Generate a frame at time t."""
-        # Calculate displayed time (counting down) with acceleration
-        accel_start_time = ACCELERATION_START * ACTUAL_DURATION
-
-        if t <= accel_start_time:
-            # Normal speed phase: 1 second of video = 1 second on timer
-            visual_time = t
-        else:
-            # Acceleration phase
-            normal_phase_display = accel_start_time  # Time counted during normal phase
-            accel_phase_actual = t - accel_start_time  # Time elapsed in acceleration phase
-
-            if USE_GRADUAL_ACCELERATION:
-                # Gradual speed increase using kinematic equation: s = v0*t + 0.5*a*t^2
-                accel_phase_display = (
-                    1.0 * accel_phase_actual + 0.5 * ACCEL_RATE * accel_phase_actual**2
-                )
-            else:
-                # Constant speed change
-                accel_phase_display = accel_phase_actual * ACCELERATION_FACTOR
-
-            visual_time = normal_phase_display + accel_phase_display
-
-        remaining_time = DISPLAY_DURATION - visual_time
-        remaining_time = max(0, remaining_time)
+def generate_timer_video(output_path: str = "output/timer_test.mp4", progress=None):
+    """Generate a countdown timer video, calling progress(done, total) per frame if given."""
 
-        time_str = format_time(remaining_time)
+    # Phase boundary is fixed for the whole video
+    accel_start_time = ACCELERATION_START * ACTUAL_DURATION
 
-        # Create image with PIL
-        img = Image.new("RGB", RESOLUTION, color=BACKGROUND_COLOR)
-        draw = ImageDraw.Draw(img)
-
-        # Draw text centered (anchor='mm' means middle-middle)
-        draw.text((center_x, center_y), time_str, font=font, fill=TEXT_COLOR, anchor="mm")
-
-        return np.array(img)
+    # Displayed time of every frame in one vectorized pass (counting down with acceleration)
+    n_frames = int(np.ceil(ACTUAL_DURATION * FPS))
+    t = np.arange(n_frames) / FPS
+    accel_phase_actual = np.maximum(0.0, t - accel_start_time)  # Time elapsed in acceleration phase
+    if USE_GRADUAL_ACCELERATION:
+        # Gradual speed increase using kinematic equation: s = v0*t + 0.5*a*t^2
+        accel_phase_display = 1.0 * accel_phase_actual + 0.5 * ACCEL_RATE * accel_phase_actual**2
+    else:
+        # Constant speed change
+        accel_phase_display = accel_phase_actual * ACCELERATION_FACTOR
+    # Normal speed phase: 1 second of video = 1 second on timer
+    visual_time = np.where(t <= accel_start_time, t, accel_start_time + accel_phase_display)
 
-    # Create video
-    video = VideoClip(make_frame=make_frame, duration=ACTUAL_DURATION)
-    video = video.set_fps(FPS)
+    # Whole seconds left per frame, formatted into the frame -> string table
+    remaining_secs = np.clip(DISPLAY_DURATION - visual_time, 0, None).astype(np.int64)
+    frame_strs = [format_time(secs) for secs in remaining_secs.tolist()]
 
     # Ensure output directory exists
     Path(output_path).parent.mkdir(exist_ok=True, parents=True)
@@ -125,26 +95,21 @@ def generate_timer_video(output_path: str = "output/timer_test.mp4"):
     print(f"  Resolution: {RESOLUTION[0]}x{RESOLUTION[1]}")
     print(f"  Output: {output_path}")
 
-    # Configure codec based on GPU availability
-    codec, ffmpeg_params = get_codec_config()
-
-    try:
-        video.write_videofile(
-            output_path, fps=FPS, codec=codec, audio=False, ffmpeg_params=ffmpeg_params
-        )
-    except Exception as e:
-        print(f"GPU encoding failed, falling back to CPU: {e}")
-        codec, ffmpeg_params = get_codec_config(use_gpu=False)
-        video.write_videofile(
-            output_path,
-            fps=FPS,
-            codec=codec,
-            audio=False,
-            ffmpeg_params=ffmpeg_params,
-        )
+    # Only libass needs the font itself, and only one loaded from a file (Pillow's built-in
+    # fallback font has no file to hand over); otherwise render the frames here
+    font = load_digital_font() if RENDER_TEXT_IN_FFMPEG else None
+    if isinstance(getattr(font, "path", None), (str, os.PathLike)):
+        write_subtitle_video(frame_strs, output_path, FPS, font)
+    else:
+        text_colors = (TEXT_COLOR,) * TIME_SLOTS
+        frame_specs = [(time_str, text_colors) for time_str in frame_strs]
+        render_text_video(frame_specs, output_path, FPS, progress=progress)
 
     print(f"✓ Video saved to {output_path}")
 
 
 if __name__ == "__main__":
-    generate_timer_video()
+    if "--profile" in sys.argv:
+        profile(generate_timer_video)
+    else:
+        generate_timer_video()
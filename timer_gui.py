@@ -1,12 +1,124 @@
 #!/usr/bin/env python3
 """Streamlit GUI for timer video generation - No coding required!"""
 
-import streamlit as st
-import subprocess
+import os
+
+# The generators run in a background thread. Numba's default TBB thread pool hangs
+# interpreter exit when first started off the main thread, OpenMP does not.
+os.environ.setdefault("NUMBA_THREADING_LAYER_PRIORITY", "omp workqueue tbb")
+
+import contextlib
+import importlib
+import io
+import shutil
 import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import tempfile
-import shutil
+
+import streamlit as st
+
+# The generator modules live next to this file
+sys.path.insert(0, str(Path(__file__).parent.absolute()))
+
+import timer_utils
+
+
+@st.cache_resource
+def find_ffmpeg():
+    """Look ffmpeg up on PATH once per server rather than on every rerun."""
+    return shutil.which("ffmpeg")
+
+
+# Try to find ffmpeg automatically, otherwise keep timer_utils' /usr/bin/ffmpeg default
+timer_utils.FFMPEG_BINARY = find_ffmpeg() or timer_utils.FFMPEG_BINARY
+
+
+def load_generator(name: str, **settings):
+    """Import a generator module with its defaults restored, then override settings."""
+    module = importlib.reload(importlib.import_module(name))
+    for setting, value in settings.items():
+        setattr(module, setting, value)
+    return module
+
+
+class ThreadStdout:
+    """sys.stdout stand-in that sends each capturing thread's prints to its own log.
+
+    contextlib.redirect_stdout swaps sys.stdout for the whole process, so one session's
+    run would also swallow whatever every other Streamlit thread prints meanwhile.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def _target(self):
+        return getattr(self._local, "log", None) or self._stream
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+    @contextlib.contextmanager
+    def capture(self, log):
+        """Send what the current thread prints to log until the block exits."""
+        self._local.log = log
+        try:
+            yield log
+        finally:
+            self._local.log = None
+
+
+@st.cache_resource
+def thread_stdout():
+    """Install one ThreadStdout for the whole server, the first time it is needed."""
+    sys.stdout = proxy = ThreadStdout(sys.stdout)
+    return proxy
+
+
+@st.cache_resource
+def render_lock():
+    """Held from configuring a generator until its render ends, across every session.
+
+    load_generator reloads the shared generator modules, so a second run must not start
+    while one is still reading them.
+    """
+    return threading.Lock()
+
+
+@st.cache_resource
+def generation_executor():
+    """One render thread per server, so the script thread stays free to redraw the page."""
+    return ThreadPoolExecutor(max_workers=1)
+
+
+def run_generation(generator, output_path: str, job: dict, lock):
+    """Render a video in the background, recording progress and output in job.
+
+    lock is released before the job counts as done, so the page drawn once the job is
+    seen finished already offers the generate button again.
+    """
+
+    def report(done, total):
+        job["done"], job["total"] = done, total
+
+    try:
+        with thread_stdout().capture(job["log"]):
+            generator.generate_timer_video(output_path, progress=report)
+    except Exception:
+        job["log"].write(traceback.format_exc())
+        raise
+    finally:
+        lock.release()
+
 
 st.set_page_config(page_title="Tempus Fugit", page_icon="⏱", layout="wide")
 
@@ -183,8 +295,13 @@ with tab1:
     # Generate button
     col_btn1, col_btn2, col_btn3 = st.columns([1, 1, 1])
 
+    # A render started from any session blocks new ones until it finishes
+    job_running = render_lock().locked()
+
     with col_btn2:
-        generate_button = st.button("Generate Video", type="primary", use_container_width=True)
+        generate_button = st.button(
+            "Generate Video", type="primary", use_container_width=True, disabled=job_running
+        )
 
 with tab2:
     st.markdown(
@@ -265,233 +382,139 @@ if generate_button:
     # Validate settings
     if actual_duration <= 0 or display_duration <= 0:
         st.error("Duration values must be positive!")
+    elif not render_lock().acquire(blocking=False):
+        st.warning("A video is already being generated, wait for it to finish.")
     else:
-        # Create a temporary Python file with the settings
         output_path = f"output/{output_name}.mp4"
+        lock = render_lock()
+        try:
+            # Configure the generator module for this run
+            if "Jump" in timer_type:
+                generator = load_generator(
+                    "jump",
+                    FPS=fps,
+                    DISPLAY_DURATION=display_duration,
+                    ACTUAL_DURATION=actual_duration,
+                    JUMP_START=jump_start,
+                    JUMP_AMOUNT=jump_amount,
+                    GLITCH_BEFORE_JUMP=glitch_before_jump,
+                )
 
-        with st.spinner(f"Generating {timer_type}... This may take a few minutes..."):
-            try:
-                # Determine which script to modify and run
-                if "Jump" in timer_type:
-                    # Create temporary modified jump.py
-                    script_content = f"""#!/usr/bin/env python3
-import os
-import shutil
-
-# Try to find ffmpeg automatically
-ffmpeg_path = shutil.which("ffmpeg")
-if ffmpeg_path:
-    os.environ["FFMPEG_BINARY"] = ffmpeg_path
-elif os.path.exists("/usr/bin/ffmpeg"):
-    os.environ["FFMPEG_BINARY"] = "/usr/bin/ffmpeg"
-# Otherwise let moviepy find it
-
-import sys
-sys.path.insert(0, '{Path(__file__).parent.absolute()}')
-
-# Override settings
-FPS = {fps}
-DISPLAY_DURATION = {display_duration}
-ACTUAL_DURATION = {actual_duration}
-JUMP_START = {jump_start}
-JUMP_AMOUNT = {jump_amount}
-GLITCH_BEFORE_JUMP = {glitch_before_jump}
-OUTPUT_PATH = "{output_path}"
-
-# Import and patch jump module
-import jump
-jump.FPS = FPS
-jump.DISPLAY_DURATION = DISPLAY_DURATION
-jump.ACTUAL_DURATION = ACTUAL_DURATION
-jump.JUMP_START = JUMP_START
-jump.JUMP_AMOUNT = JUMP_AMOUNT
-jump.GLITCH_BEFORE_JUMP = GLITCH_BEFORE_JUMP
-
-# Recalculate derived values
-jump.jump_time = JUMP_START * ACTUAL_DURATION
-jump.normal_display_time = jump.jump_time
-jump.remaining_display_time = DISPLAY_DURATION - jump.normal_display_time - JUMP_AMOUNT
-jump.remaining_actual_time = ACTUAL_DURATION - jump.jump_time
-jump.RUSH_FACTOR = jump.remaining_display_time / jump.remaining_actual_time if jump.remaining_actual_time > 0 else 1.0
-
-jump.generate_timer_video(OUTPUT_PATH)
-"""
-
-                elif "Simple" in timer_type:
-                    script_content = f"""#!/usr/bin/env python3
-import os
-import shutil
-
-# Try to find ffmpeg automatically
-ffmpeg_path = shutil.which("ffmpeg")
-if ffmpeg_path:
-    os.environ["FFMPEG_BINARY"] = ffmpeg_path
-elif os.path.exists("/usr/bin/ffmpeg"):
-    os.environ["FFMPEG_BINARY"] = "/usr/bin/ffmpeg"
-# Otherwise let moviepy find it
-
-import sys
-sys.path.insert(0, '{Path(__file__).parent.absolute()}')
-
-FPS = {fps}
-DISPLAY_DURATION = {display_duration}
-ACTUAL_DURATION = {actual_duration}
-ACCELERATION_START = {acceleration_start}
-USE_GRADUAL_ACCELERATION = {use_gradual}
-OUTPUT_PATH = "{output_path}"
-
-import main
-main.FPS = FPS
-main.DISPLAY_DURATION = DISPLAY_DURATION
-main.ACTUAL_DURATION = ACTUAL_DURATION
-main.ACCELERATION_START = ACCELERATION_START
-main.USE_GRADUAL_ACCELERATION = USE_GRADUAL_ACCELERATION
-
-# Recalculate
-main.accel_start_time = ACCELERATION_START * ACTUAL_DURATION
-main.normal_display_time = main.accel_start_time
-main.remaining_display_time = DISPLAY_DURATION - main.normal_display_time
-main.remaining_actual_time = ACTUAL_DURATION - main.accel_start_time
-main.ACCEL_RATE = (
-    2 * (main.remaining_display_time - main.remaining_actual_time) / (main.remaining_actual_time**2)
-    if main.remaining_actual_time > 0 else 0.0
-)
-main.ACCELERATION_FACTOR = (
-    main.remaining_display_time / main.remaining_actual_time if main.remaining_actual_time > 0 else 1.0
-)
-
-main.generate_timer_video(OUTPUT_PATH)
-"""
-
-                elif "Weird" in timer_type:
-                    script_content = f"""#!/usr/bin/env python3
-import os
-import shutil
-
-# Try to find ffmpeg automatically
-ffmpeg_path = shutil.which("ffmpeg")
-if ffmpeg_path:
-    os.environ["FFMPEG_BINARY"] = ffmpeg_path
-elif os.path.exists("/usr/bin/ffmpeg"):
-    os.environ["FFMPEG_BINARY"] = "/usr/bin/ffmpeg"
-# Otherwise let moviepy find it
-
-import sys
-sys.path.insert(0, '{Path(__file__).parent.absolute()}')
-
-FPS = {fps}
-DISPLAY_DURATION = {display_duration}
-ACTUAL_DURATION = {actual_duration}
-OUTPUT_PATH = "{output_path}"
-CORRUPTION_CHANCE = {1.0 - (corruption_frequency / 100.0)}
-CORRUPTION_DURATION_MAX = {corruption_duration}
-
-import weird
-weird.FPS = FPS
-weird.DISPLAY_DURATION = DISPLAY_DURATION
-weird.ACTUAL_DURATION = ACTUAL_DURATION
-
-# Patch corruption parameters in the make_frame function
-import timer_utils
-original_corrupt = timer_utils.corrupt_digit
-def patched_corrupt(char, corruption_chance=CORRUPTION_CHANCE):
-    return original_corrupt(char, corruption_chance)
-timer_utils.corrupt_digit = patched_corrupt
-
-# Store duration for use in weird.py
-weird.CORRUPTION_DURATION_MAX = CORRUPTION_DURATION_MAX
-
-weird.generate_timer_video(OUTPUT_PATH)
-"""
+                # Recalculate derived values
+                generator.jump_time = jump_start * actual_duration
+                generator.normal_display_time = generator.jump_time
+                generator.remaining_display_time = (
+                    display_duration - generator.normal_display_time - jump_amount
+                )
+                generator.remaining_actual_time = actual_duration - generator.jump_time
+                generator.RUSH_FACTOR = (
+                    generator.remaining_display_time / generator.remaining_actual_time
+                    if generator.remaining_actual_time > 0
+                    else 1.0
+                )
 
-                else:  # Festival
-                    script_content = f"""#!/usr/bin/env python3
-import os
-import shutil
+            elif "Simple" in timer_type:
+                generator = load_generator(
+                    "main",
+                    FPS=fps,
+                    DISPLAY_DURATION=display_duration,
+                    ACTUAL_DURATION=actual_duration,
+                    ACCELERATION_START=acceleration_start,
+                    USE_GRADUAL_ACCELERATION=use_gradual,
+                )
 
-# Try to find ffmpeg automatically
-ffmpeg_path = shutil.which("ffmpeg")
-if ffmpeg_path:
-    os.environ["FFMPEG_BINARY"] = ffmpeg_path
-elif os.path.exists("/usr/bin/ffmpeg"):
-    os.environ["FFMPEG_BINARY"] = "/usr/bin/ffmpeg"
-# Otherwise let moviepy find it
+                # Recalculate
+                generator.accel_start_time = acceleration_start * actual_duration
+                generator.normal_display_time = generator.accel_start_time
+                generator.remaining_display_time = (
+                    display_duration - generator.normal_display_time
+                )
+                generator.remaining_actual_time = actual_duration - generator.accel_start_time
+                remaining_display = generator.remaining_display_time
+                remaining_actual = generator.remaining_actual_time
+                generator.ACCEL_RATE = (
+                    2 * (remaining_display - remaining_actual) / (remaining_actual**2)
+                    if remaining_actual > 0
+                    else 0.0
+                )
+                generator.ACCELERATION_FACTOR = (
+                    remaining_display / remaining_actual if remaining_actual > 0 else 1.0
+                )
 
-import sys
-sys.path.insert(0, '{Path(__file__).parent.absolute()}')
+            elif "Weird" in timer_type:
+                generator = load_generator(
+                    "weird",
+                    FPS=fps,
+                    DISPLAY_DURATION=display_duration,
+                    ACTUAL_DURATION=actual_duration,
+                    CORRUPTION_CHANCE=1.0 - (corruption_frequency / 100.0),
+                    CORRUPTION_DURATION_MAX=corruption_duration,
+                )
 
-FPS = {fps}
-ACTUAL_DURATION = {actual_duration}
-OUTPUT_PATH = "{output_path}"
-NUM_JUMPS = {num_jumps}
-NUM_ANIMATIONS = {num_animations}
-CORRUPTION_CHANCE = {1.0 - (corruption_frequency / 100.0)}
-COLOR_GLITCH_CHANCE = {1.0 - (color_glitch_frequency / 100.0)}
+            else:  # Festival
+                generator = load_generator(
+                    "festival",
+                    FPS=fps,
+                    ACTUAL_DURATION=actual_duration,
+                    NUM_JUMPS=num_jumps,
+                    NUM_ANIMATIONS=num_animations,
+                    CORRUPTION_CHANCE=1.0 - (corruption_frequency / 100.0),
+                    COLOR_GLITCH_CHANCE=1.0 - (color_glitch_frequency / 100.0),
+                )
 
-import festival
-festival.FPS = FPS
-festival.ACTUAL_DURATION = ACTUAL_DURATION
+            job = {"done": 0, "total": 0, "log": io.StringIO()}
+            job["future"] = generation_executor().submit(
+                run_generation, generator, output_path, job, lock
+            )
+        except BaseException:
+            # The job never started, so it will not release the lock itself
+            lock.release()
+            raise
+        job.update(timer_type=timer_type, output_path=output_path, output_name=output_name)
+        st.session_state.job = job
+
+# Show the latest generation, polling it while it runs
+job = st.session_state.get("job")
+if job is not None:
+    future = job["future"]
+    if not future.done():
+        total = job["total"]
+        st.progress(
+            job["done"] / total if total else 0.0,
+            text=f"Generating {job['timer_type']}... frame {job['done']}/{total or '?'}",
+        )
+        time.sleep(0.5)
+        st.rerun()
 
-# Patch parameters
-festival.NUM_JUMPS = NUM_JUMPS
-festival.NUM_ANIMATIONS = NUM_ANIMATIONS
+    elif future.exception() is not None:
+        st.error(f"Error: {str(future.exception())}")
+        st.code(job["log"].getvalue())
 
-import timer_utils
-original_corrupt = timer_utils.corrupt_digit
-def patched_corrupt(char, corruption_chance=CORRUPTION_CHANCE):
-    return original_corrupt(char, corruption_chance)
-timer_utils.corrupt_digit = patched_corrupt
-
-festival.COLOR_GLITCH_CHANCE = COLOR_GLITCH_CHANCE
-
-festival.generate_timer_video(OUTPUT_PATH)
-"""
-
-                # Write temporary script
-                temp_script = Path(tempfile.gettempdir()) / "temp_timer_script.py"
-                temp_script.write_text(script_content)
-
-                # Run it
-                result = subprocess.run(
-                    [sys.executable, str(temp_script)],
-                    capture_output=True,
-                    text=True,
-                    cwd=Path(__file__).parent,
+    else:
+        output_path = job["output_path"]
+        st.success(f"Video generated successfully!")
+        st.info(f"Saved to: `{output_path}`")
+
+        # Preview the video
+        st.subheader("Preview")
+        if Path(output_path).exists():
+            st.video(output_path)
+
+            # Download button
+            with open(output_path, "rb") as video_file:
+                st.download_button(
+                    label="Download Video",
+                    data=video_file,
+                    file_name=f"{job['output_name']}.mp4",
+                    mime="video/mp4",
+                    use_container_width=True,
                 )
+        else:
+            st.warning("Video file not found. Check the output path.")
 
-                # Clean up
-                temp_script.unlink()
-
-                if result.returncode == 0:
-                    st.success(f"Video generated successfully!")
-                    st.info(f"Saved to: `{output_path}`")
-
-                    # Preview the video
-                    st.subheader("Preview")
-                    if Path(output_path).exists():
-                        st.video(output_path)
-
-                        # Download button
-                        with open(output_path, "rb") as video_file:
-                            st.download_button(
-                                label="Download Video",
-                                data=video_file,
-                                file_name=f"{output_name}.mp4",
-                                mime="video/mp4",
-                                use_container_width=True,
-                            )
-                    else:
-                        st.warning("Video file not found. Check the output path.")
-
-                    # Show details
-                    with st.expander("Generation Details"):
-                        st.code(result.stdout)
-                else:
-                    st.error(f"Generation failed!")
-                    st.code(result.stderr)
-
-            except Exception as e:
-                st.error(f"Error: {str(e)}")
+        # Show details
+        with st.expander("Generation Details"):
+            st.code(job["log"].getvalue())
 
 # Footer
 st.divider()
@@ -2,10 +2,48 @@
 """Common utilities for timer video generators."""
 
 import os
+import cProfile
+import itertools
+import multiprocessing
+import pstats
+import queue
+import statistics
+import time
+from collections import deque
+from fractions import Fraction
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from multiprocessing import shared_memory
 import random
 import math
+import shutil
+import subprocess
+import tempfile
+import threading
 from pathlib import Path
-from PIL import ImageFont
+import numpy as np
+from PIL import Image, ImageColor, ImageDraw, ImageFont
+
+try:
+    from numba import njit, prange
+
+    HAVE_NUMBA = True
+except ImportError:  # Numba is optional, hot helpers just run as plain Python
+    HAVE_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+try:
+    import av
+
+    HAVE_AV = True
+except ImportError:  # PyAV is optional, software encoding then goes through the ffmpeg pipe
+    HAVE_AV = False
 
 
 # Common Configuration
@@ -13,7 +51,40 @@ RESOLUTION = (1920, 1080)
 BACKGROUND_COLOR = "black"
 TEXT_COLOR = "red"
 FONT_SIZE = 700
+# Frames are composited at RESOLUTION / RENDER_DOWNSCALE and upscaled by the encoder (nearest
+# neighbour on the CPU, on the GPU for VAAPI); 2 moves a quarter of the pixels at the cost
+# of softer glyph edges
+RENDER_DOWNSCALE = 1
+RENDER_RESOLUTION = (
+    RESOLUTION[0] // RENDER_DOWNSCALE & ~1,  # NV12 needs even sizes
+    RESOLUTION[1] // RENDER_DOWNSCALE & ~1,
+)
 USE_GPU = True
+# "hevc_vaapi" gives smaller files (with B-frames), but browsers, e.g. the GUI preview,
+# often can't play HEVC
+VAAPI_CODEC = "h264_vaapi"
+FFMPEG_BINARY = os.environ.get("FFMPEG_BINARY", "/usr/bin/ffmpeg")  # System ffmpeg has GPU support
+# VAAPI driver for the ffmpeg children, set once at import unless the user picked one
+os.environ.setdefault("LIBVA_DRIVER_NAME", "radeonsi")
+BACKGROUND_RGB = ImageColor.getrgb(BACKGROUND_COLOR)
+_r, _g, _b = BACKGROUND_RGB
+# (Y, U, V) of the background, same BT.601 limited-range math as rgb_to_nv12()
+BACKGROUND_NV12 = (
+    ((66 * _r + 129 * _g + 25 * _b + 128) >> 8) + 16,
+    ((-38 * _r - 74 * _g + 112 * _b + 128) >> 8) + 128,
+    ((112 * _r - 94 * _g - 18 * _b + 128) >> 8) + 128,
+)
+del _r, _g, _b
+TIME_SLOTS = 5  # Characters in a MM:SS string
+# Lay MM:SS texts out on fixed slots (widest digit, colon) with each glyph centered in its
+# slot, so a narrow glitch glyph no longer re-centers the whole string and only its slot
+# gets redrawn; off keeps the original tight, re-centered layout
+FIXED_SLOTS = False
+NUM_WORKERS = os.cpu_count() or 1  # Frame rendering processes (1 = render in-process)
+FRAME_CACHE_SIZE = 8  # Finished frames each renderer keeps for texts that come back
+
+# Every glyph a timer can display: digits, separators, corruption and animation characters
+GLYPHS = "0123456789:ODI|lZzEASsGbTBgq;-"
 
 
 def format_time(seconds: float) -> str:
@@ -23,8 +94,31 @@ def format_time(seconds: float) -> str:
     return f"{mins:02d}:{secs:02d}"
 
 
+# Every MM:SS string below the 10 minute wrap, formatted once
+_FORMATTED = tuple(f"{s // 60:02d}:{s % 60:02d}" for s in range(600))
+
+
+def format_time_fast(seconds: float) -> str:
+    """Format seconds as MM:SS via a lookup table, wrapping at 10 minutes."""
+    return _FORMATTED[int(seconds) % 600]
+
+
+# Remembers which font candidate loaded last time, so later runs try it first. It lives in
+# the user's own cache directory: a fixed name in the shared temp dir could be pre-created
+# or symlinked by another local user.
+FONT_CACHE_FILE = (
+    Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "tempus-fugit" / "font"
+)
+
+
+@lru_cache(maxsize=None)
 def load_digital_font(font_size: int = FONT_SIZE):
-    """Try to load a digital-style font, fallback to default if not found."""
+    """Try to load a digital-style font, fallback to default if not found.
+
+    The lookup runs once per size, later calls share the same font object. The
+    candidate that worked is recorded in FONT_CACHE_FILE and tried first by later
+    processes; delete the file to pick up a newly installed font.
+    """
     home = Path.home()
     digital_fonts = [
         str(home / ".fonts/digital-7 (mono).ttf"),
@@ -37,88 +131,1024 @@ def load_digital_font(font_size: int = FONT_SIZE):
         "DSEG7Classic-Bold",
         "/usr/share/fonts/truetype/dejavu/DejaVuSansMono-Bold.ttf",
     ]
+    try:
+        cached = FONT_CACHE_FILE.read_text().strip()
+    except OSError:
+        cached = None
+    if cached in digital_fonts:
+        digital_fonts.remove(cached)
+        digital_fonts.insert(0, cached)
 
     for font_name in digital_fonts:
         try:
             font = ImageFont.truetype(font_name, font_size)
             print(f"Using font: {font_name}")
-            return font
         except (OSError, IOError):
             continue
+        if font_name != cached:
+            try:
+                FONT_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+                FONT_CACHE_FILE.write_text(font_name)
+            except OSError:
+                pass  # Only a startup shortcut
+        return font
 
     print("Warning: No digital font found. Install 'Digital-7' or similar for best results.")
     print("Download from: https://www.1001fonts.com/digital-7-font.html")
     return ImageFont.load_default()
 
 
-def get_codec_config(use_gpu: bool = USE_GPU):
-    """Get codec and ffmpeg parameters based on GPU availability."""
+@lru_cache(maxsize=None)
+def measure_char_widths(font, chars: str = GLYPHS) -> dict:
+    """Measure the rendered width of each character once, for fixed-font layout.
+
+    Results are cached per font and character set; treat the dict as read-only.
+    """
+    widths = {}
+    for char in chars:
+        left, _, right, _ = font.getbbox(char)
+        widths[char] = right - left
+    return widths
+
+
+def render_glyph_sprites(font, colors, chars: str = GLYPHS) -> dict:
+    """Rasterize each char once into a tight NumPy tile over the background, per color.
+
+    Returns {(char, color): (rgb, mask, (dx, dy))} where rgb is the glyph composited
+    on BACKGROUND_COLOR, mask marks the glyph's pixels and (dx, dy) is the tile offset
+    from the text origin when drawn with anchor="lm". Glyphs are drawn once as
+    single-channel coverage and colored through a 256-entry lookup table per color.
+    """
+    # Coverage -> RGB tables, blended by PIL itself so tiles match a direct paste
+    ramp = Image.frombytes("L", (256, 1), bytes(range(256)))
+    luts = {}
+    for color in colors:
+        row = Image.new("RGB", (256, 1), BACKGROUND_COLOR)
+        row.paste(color, (0, 0, 256, 1), ramp)
+        luts[color] = np.asarray(row)[0]
+
+    draw = ImageDraw.Draw(Image.new("L", (1, 1)))
+    sprites = {}
+    for char in chars:
+        left, top, right, bottom = draw.textbbox((0, 0), char, font=font, anchor="lm")
+        size = (max(1, right - left), max(1, bottom - top))
+        alpha = Image.new("L", size, 0)
+        ImageDraw.Draw(alpha).text((-left, -top), char, font=font, fill=255, anchor="lm")
+        coverage = np.asarray(alpha)
+        mask = coverage > 0
+        for color in colors:
+            sprites[(char, color)] = (luts[color][coverage], mask, (left, top))
+    return sprites
+
+
+@njit(parallel=True, cache=True)
+def _rgb_to_nv12_kernel(rgb, nv12, x0, y0, x1, y1):
+    """Compiled rgb_to_nv12 body, one 2x2 chroma block at a time, rows in parallel."""
+    height = rgb.shape[0]
+    for block_row in prange((y1 - y0) // 2):
+        y = y0 + 2 * block_row
+        for x in range(x0, x1, 2):
+            r_sum = 0
+            g_sum = 0
+            b_sum = 0
+            for dy in range(2):
+                for dx in range(2):
+                    r = np.int32(rgb[y + dy, x + dx, 0])
+                    g = np.int32(rgb[y + dy, x + dx, 1])
+                    b = np.int32(rgb[y + dy, x + dx, 2])
+                    nv12[y + dy, x + dx] = ((66 * r + 129 * g + 25 * b + 128) >> 8) + 16
+                    r_sum += r
+                    g_sum += g
+                    b_sum += b
+            r = (r_sum + 2) >> 2
+            g = (g_sum + 2) >> 2
+            b = (b_sum + 2) >> 2
+            nv12[height + y // 2, x] = ((-38 * r - 74 * g + 112 * b + 128) >> 8) + 128
+            nv12[height + y // 2, x + 1] = ((112 * r - 94 * g - 18 * b + 128) >> 8) + 128
+
+
+def rgb_to_nv12(rgb: np.ndarray, nv12: np.ndarray, rect=None):
+    """Convert rect (x0, y0, x1, y1) of an RGB frame into an NV12 frame, in place.
+
+    Uses BT.601 limited range like ffmpeg's default RGB to YUV conversion, with
+    chroma averaged over 2x2 blocks. The rect is widened to even coordinates.
+    """
+    height, width = rgb.shape[:2]
+    x0, y0, x1, y1 = rect or (0, 0, width, height)
+    x0, y0 = x0 & ~1, y0 & ~1
+    x1, y1 = min((x1 + 1) & ~1, width), min((y1 + 1) & ~1, height)
+    if x0 >= x1 or y0 >= y1:
+        return
+    if HAVE_NUMBA:
+        _rgb_to_nv12_kernel(rgb, nv12, x0, y0, x1, y1)
+        return
+
+    region = rgb[y0:y1, x0:x1].astype(np.int32)
+    r, g, b = region[:, :, 0], region[:, :, 1], region[:, :, 2]
+    nv12[y0:y1, x0:x1] = ((66 * r + 129 * g + 25 * b + 128) >> 8) + 16
+
+    # Average each 2x2 block, then interleave U and V on the half-height chroma plane
+    h, w = (y1 - y0) // 2, (x1 - x0) // 2
+    block = (region.reshape(h, 2, w, 2, 3).sum(axis=(1, 3)) + 2) >> 2
+    r, g, b = block[:, :, 0], block[:, :, 1], block[:, :, 2]
+    uv = nv12[height + y0 // 2 : height + y1 // 2, x0:x1]
+    uv[:, 0::2] = ((-38 * r - 74 * g + 112 * b + 128) >> 8) + 128
+    uv[:, 1::2] = ((112 * r - 94 * g - 18 * b + 128) >> 8) + 128
+
+
+def sprites_to_nv12(sprites: dict) -> dict:
+    """Convert RGB glyph sprites into tiles that paste straight into an NV12 frame.
+
+    Returns {key: (y, y_mask, uv, uv_mask, (dx, dy))} with the luma tile, its
+    mask, the interleaved half-height chroma tile and its mask. Tiles are padded
+    with background to even sizes and even offsets, so they cover whole 2x2
+    chroma blocks when pasted at even coordinates.
+    """
+    nv12_sprites = {}
+    for key, (rgb, mask, (dx, dy)) in sprites.items():
+        pad_x, pad_y = dx & 1, dy & 1
+        h, w = mask.shape
+        height, width = (h + pad_y + 1) & ~1, (w + pad_x + 1) & ~1
+        tile = np.empty((height, width, 3), dtype=np.uint8)
+        tile[:] = BACKGROUND_RGB
+        tile[pad_y : pad_y + h, pad_x : pad_x + w] = rgb
+        y_mask = np.zeros((height, width), dtype=bool)
+        y_mask[pad_y : pad_y + h, pad_x : pad_x + w] = mask
+
+        nv12 = np.empty((height * 3 // 2, width), dtype=np.uint8)
+        rgb_to_nv12(tile, nv12)
+        # A chroma pair changes wherever any pixel of its 2x2 block is glyph
+        block = y_mask.reshape(height // 2, 2, width // 2, 2).any(axis=(1, 3))
+        uv_mask = np.repeat(block, 2, axis=1)
+        anchor = (dx - pad_x, dy - pad_y)
+        nv12_sprites[key] = (nv12[:height], y_mask, nv12[height:], uv_mask, anchor)
+    return nv12_sprites
+
+
+@lru_cache(maxsize=None)
+def load_glyph_sprites(font_size: int, colors: tuple):
+    """Return (char_widths, NV12 sprites) for every glyph in each color, built once.
+
+    Later calls with the same size and colors, e.g. the CPU retry after a failed GPU
+    encode or the next GUI run, reuse the same tiles; treat them as read-only.
+    """
+    font = load_digital_font(font_size)
+    return measure_char_widths(font), sprites_to_nv12(render_glyph_sprites(font, colors))
+
+
+def new_frame_buffer() -> np.ndarray:
+    """Allocate a render-resolution NV12 frame filled with the background color."""
+    frame = np.empty((RENDER_RESOLUTION[1] * 3 // 2, RENDER_RESOLUTION[0]), dtype=np.uint8)
+    fill_background(frame, (0, 0, RENDER_RESOLUTION[0], RENDER_RESOLUTION[1]))
+    return frame
+
+
+def fill_background(frame: np.ndarray, rect):
+    """Reset rect (x0, y0, x1, y1, even coordinates) of an NV12 frame to the background."""
+    x0, y0, x1, y1 = rect
+    height = frame.shape[0] * 2 // 3
+    y_bg, u_bg, v_bg = BACKGROUND_NV12
+    frame[y0:y1, x0:x1] = y_bg
+    uv = frame[height + y0 // 2 : height + y1 // 2, x0:x1]
+    uv[:, 0::2] = u_bg
+    uv[:, 1::2] = v_bg
+
+
+def sprite_rect(sprite, x: int, y: int):
+    """Return the rectangle (x0, y0, x1, y1) a sprite pasted at (x, y) covers on a frame.
+
+    The rectangle is clipped to the frame, and empty (0, 0, 0, 0) if fully off-screen.
+    """
+    h, w = sprite[1].shape
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + w, RENDER_RESOLUTION[0]), min(y + h, RENDER_RESOLUTION[1])
+    if x0 >= x1 or y0 >= y1:
+        return (0, 0, 0, 0)
+    return (x0, y0, x1, y1)
+
+
+def blit_sprite(frame: np.ndarray, sprite, x: int, y: int):
+    """Copy an NV12 glyph tile's pixels into frame at even (x, y), clipped to the frame.
+
+    Returns the touched rectangle (x0, y0, x1, y1), empty if fully off-screen.
+    """
+    y_tile, y_mask, uv_tile, uv_mask, _ = sprite
+    height = frame.shape[0] * 2 // 3
+    x0, y0, x1, y1 = sprite_rect(sprite, x, y)
+    if x0 >= x1:
+        return (x0, y0, x1, y1)
+    cols = slice(x0 - x, x1 - x)
+    src = (slice(y0 - y, y1 - y), cols)
+    np.copyto(frame[y0:y1, x0:x1], y_tile[src], where=y_mask[src])
+    src = (slice((y0 - y) // 2, (y1 - y) // 2), cols)
+    dst = frame[height + y0 // 2 : height + y1 // 2, x0:x1]
+    np.copyto(dst, uv_tile[src], where=uv_mask[src])
+    return (x0, y0, x1, y1)
+
+
+def layout_text(text: str, colors, char_widths: dict, sprites: dict) -> list:
+    """Place NV12 glyph sprites for text centered on the frame, each char with its own color.
+
+    Returns one (sprite, x, y) per char, or None for a space, which leaves a
+    digit-wide gap. Glyphs snap to even pixels to stay aligned with the chroma blocks.
+    With FIXED_SLOTS, MM:SS texts use fixed slot widths instead of their glyphs' own.
+    """
+    center_x = RENDER_RESOLUTION[0] // 2
+    center_y = RENDER_RESOLUTION[1] // 2 & ~1
+
+    # Slot widths from cached glyph widths (spaces take the width of a digit)
+    if FIXED_SLOTS and len(text) == TIME_SLOTS:
+        digit_width = max(char_widths[digit] for digit in "0123456789")
+        slot_widths = [digit_width, digit_width, char_widths[":"], digit_width, digit_width]
+    else:
+        slot_widths = [char_widths[c if c != " " else "0"] for c in text]
+    current_x = center_x - sum(slot_widths) // 2
+
+    placed = []
+    for char, color, slot_width in zip(text, colors, slot_widths):
+        if char == " ":
+            placed.append(None)
+        else:
+            sprite = sprites[(char, color)]
+            dx, dy = sprite[4]
+            x = current_x + (slot_width - char_widths[char]) // 2  # Centered in its slot
+            placed.append((sprite, (x & ~1) + dx, center_y + dy))
+
+        # Move to next character position
+        current_x += slot_width
+
+    return placed
+
+
+def _union_rect(rects):
+    """Smallest rectangle covering every non-empty rect, (0, 0, 0, 0) if there is none."""
+    rects = [rect for rect in rects if rect[0] < rect[2]]
+    if not rects:
+        return (0, 0, 0, 0)
+    return (
+        min(rect[0] for rect in rects),
+        min(rect[1] for rect in rects),
+        max(rect[2] for rect in rects),
+        max(rect[3] for rect in rects),
+    )
+
+
+def _overlaps(a, b) -> bool:
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def blit_text(frame: np.ndarray, text: str, colors, char_widths: dict, sprites: dict):
+    """Lay NV12 glyph sprites for text out centered on frame, each char with its own color.
+
+    See layout_text() for the placement. Returns the touched rectangle
+    (x0, y0, x1, y1), empty if nothing was drawn.
+    """
+    return _union_rect(
+        blit_sprite(frame, *glyph)
+        for glyph in layout_text(text, colors, char_widths, sprites)
+        if glyph is not None
+    )
+
+
+def make_text_renderer(char_widths: dict, sprites: dict):
+    """Build a render(text, colors) function that lays NV12 glyph sprites out centered.
+
+    Frames are composited directly in NV12 (the encoder's input format) in a
+    buffer reused between calls. Only the glyph slots whose glyph or position
+    changed (plus any neighbour overlapping them) are cleared and redrawn, and
+    repeating the previous text redraws nothing.
+    """
+    frame = new_frame_buffer()
+    drawn = [None]  # (text, colors) currently in the buffer
+    slots = []  # [(sprite, x, y) or None, rect] per char currently in the buffer
+
+    def render(text: str, colors) -> np.ndarray:
+        # Consecutive frames mostly show the same text, nothing to redraw then
+        if (text, colors) == drawn[0]:
+            return frame
+        drawn[0] = (text, colors)
+
+        placed = layout_text(text, colors, char_widths, sprites)
+        if len(placed) != len(slots):
+            # Different slot count, clear everything the previous text touched
+            fill_background(frame, _union_rect(rect for _, rect in slots))
+            slots[:] = [
+                [glyph, blit_sprite(frame, *glyph) if glyph else (0, 0, 0, 0)] for glyph in placed
+            ]
+            return frame
+
+        # Only the changed slots need clearing; a neighbour whose tile overlaps a
+        # changed slot's old or new area is redrawn too, keeping left-to-right paint order
+        changed = [
+            i
+            for i, (new, (old, _)) in enumerate(zip(placed, slots))
+            # Sprites hold arrays, so compare them by identity (None is None for two spaces)
+            if new is not old
+            and (new is None or old is None or new[0] is not old[0] or new[1:] != old[1:])
+        ]
+        if not changed:
+            return frame
+        touched = []
+        for i in changed:
+            fill_background(frame, slots[i][1])
+            touched.append(slots[i][1])
+            if placed[i]:
+                touched.append(sprite_rect(*placed[i]))
+            slots[i] = [None, (0, 0, 0, 0)]
+        for i, glyph in enumerate(placed):
+            if glyph and (i in changed or any(_overlaps(slots[i][1], rect) for rect in touched)):
+                slots[i] = [glyph, blit_sprite(frame, *glyph)]
+        return frame
+
+    return render
+
+
+def share_sprites(sprites: dict):
+    """Copy every sprite's arrays into one shared memory block.
+
+    sprites maps keys to (*arrays, anchor) tuples. Returns (shm, layout); layout
+    describes where each array lives so that attach_sprites() can rebuild the dict
+    as views without copying. The caller owns shm and must close and unlink it.
+    """
+    layout = []
+    offset = 0
+    for key, (*arrays, anchor) in sprites.items():
+        views = []
+        for array in arrays:
+            views.append((offset, array.shape, array.dtype.str))
+            offset += array.nbytes
+        layout.append((key, views, anchor))
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for (_, views, _), (*arrays, _) in zip(layout, sprites.values()):
+        for (offset, shape, dtype), array in zip(views, arrays):
+            np.ndarray(shape, dtype, shm.buf, offset)[:] = array
+    return shm, layout
+
+
+def attach_sprites(shm, layout) -> dict:
+    """Rebuild the sprite dict from share_sprites() as read-only views into shm."""
+    sprites = {}
+    for key, views, anchor in layout:
+        arrays = []
+        for offset, shape, dtype in views:
+            array = np.ndarray(shape, dtype, shm.buf, offset)
+            array.flags.writeable = False
+            arrays.append(array)
+        sprites[key] = (*arrays, anchor)
+    return sprites
+
+
+def frame_bytes_renderer(render, cache_size: int = FRAME_CACHE_SIZE):
+    """Wrap a make_text_renderer() function so it returns each frame as bytes.
+
+    The last cache_size distinct frames are kept: while the text repeats, or when it
+    comes back (a glitch clearing, a reversal revisiting a second), the same bytes
+    object is returned again instead of copying the frame out of the buffer into a
+    fresh 3 MB allocation. render() tracks what its buffer holds, so skipping it on
+    a hit keeps later redraws correct.
+    """
+
+    @lru_cache(maxsize=max(cache_size, 1))
+    def render_bytes(text: str, colors) -> bytes:
+        return render(text, colors).tobytes()
+
+    return render_bytes
+
+
+# Per-process renderer (and the shared sprite block it reads) used by render_text_frames() workers
+_worker_render = None
+_worker_shm = None
+
+
+def _init_render_worker(char_widths: dict, shm_name: str, layout):
+    global _worker_render, _worker_shm
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    sprites = attach_sprites(_worker_shm, layout)
+    _worker_render = frame_bytes_renderer(make_text_renderer(char_widths, sprites))
+
+
+def _render_chunk(specs) -> list:
+    # Repeated frames are one bytes object, which pickle sends back only once
+    return [_worker_render(text, colors) for text, colors in specs]
+
+
+def render_text_frames(specs, char_widths: dict, sprites: dict, num_workers: int = NUM_WORKERS):
+    """Yield raw NV12 bytes for each (text, colors) frame spec, in order.
+
+    sprites are NV12 glyph tiles from sprites_to_nv12() (see load_glyph_sprites()).
+    With several workers, chunks of frames are rendered in a process pool whose
+    workers all map the same shared copy of the glyph sprites; only a few chunks are
+    in flight at a time.
+    """
+    if num_workers <= 1:
+        render = frame_bytes_renderer(make_text_renderer(char_widths, sprites))
+        for text, colors in specs:
+            yield render(text, colors)
+        return
+
+    chunk_size = 16
+    chunks = (specs[i : i + chunk_size] for i in range(0, len(specs), chunk_size))
+    shm, layout = share_sprites(sprites)
+    try:
+        # Spawned workers: forking a process whose Numba thread pool is already running
+        # leaves it hanging at exit
+        with ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_render_worker,
+            initargs=(char_widths, shm.name, layout),
+        ) as executor:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(_render_chunk, chunk))
+                if len(pending) >= 2 * num_workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def get_codec_config(use_gpu: bool = USE_GPU, pix_fmt: str = "rgb24", fps: float = None):
+    """Get codec and ffmpeg parameters based on GPU availability.
+
+    pix_fmt is the format of the frames fed to ffmpeg; nv12 input is uploaded to
+    the GPU as-is, anything else is converted to nv12 first. Both encoders are tuned
+    for speed on mostly static content; with fps given, keyframes are 10s apart.
+    """
     if use_gpu:
-        os.environ["LIBVA_DRIVER_NAME"] = "radeonsi"
-        codec = "h264_vaapi"
+        codec = VAAPI_CODEC
         ffmpeg_params = [
             "-init_hw_device",
             "vaapi=va:/dev/dri/renderD128",
             "-filter_hw_device",
             "va",
             "-vf",
-            "format=nv12,hwupload",
+            "hwupload" if pix_fmt == "nv12" else "format=nv12,hwupload",
+            "-rc_mode",
+            "CQP",
             "-qp",
             "23",
+            # Deeper surface queue keeps the GPU busy between frames
+            "-async_depth",
+            "4",
         ]
+        if codec == "hevc_vaapi":
+            # Near-identical frames cost almost nothing as B-frames; hvc1 plays in QuickTime
+            ffmpeg_params += ["-profile:v", "main", "-bf", "2", "-tag:v", "hvc1"]
+        else:
+            # No B-frames: nothing moves, they only add encode latency on H.264. -quality
+            # (higher is faster) is an h264_vaapi option, hevc_vaapi has no speed knob.
+            ffmpeg_params += ["-bf", "0", "-quality", "7"]
         print(f"  Codec: {codec} (AMD GPU accelerated via VAAPI)")
     else:
         codec = "libx264"
-        ffmpeg_params = ["-preset", "medium", "-crf", "23"]
+        ffmpeg_params = [
+            "-preset",
+            "ultrafast",
+            "-tune",
+            "stillimage",
+            "-crf",
+            "23",
+            "-threads",
+            "0",
+        ]
         print(f"  Codec: {codec} (CPU)")
 
+    if fps:
+        ffmpeg_params += ["-g", str(round(fps * 10))]
     return codec, ffmpeg_params
 
 
-def corrupt_digit(char: str, corruption_chance: float = 0.997) -> str:
-    """Randomly corrupt a digit to look glitchy."""
-    if random.random() > corruption_chance:
-        corruption_map = {
-            "0": ["O", "0", "D"],
-            "1": ["I", "1", "|", "l"],
-            "2": ["Z", "2", "z"],
-            "3": ["3", "E"],
-            "4": ["4", "A"],
-            "5": ["S", "5", "s"],
-            "6": ["6", "G", "b"],
-            "7": ["7", "T"],
-            "8": ["8", "B"],
-            "9": ["9", "g", "q"],
-            ":": [":", ";"],
+def prepend_video_filter(ffmpeg_params, vf: str) -> list:
+    """Return ffmpeg_params with vf run before any -vf filter chain they already have."""
+    ffmpeg_params = list(ffmpeg_params)
+    if "-vf" in ffmpeg_params:
+        idx = ffmpeg_params.index("-vf") + 1
+        ffmpeg_params[idx] = f"{vf},{ffmpeg_params[idx]}"
+    else:
+        ffmpeg_params += ["-vf", vf]
+    return ffmpeg_params
+
+
+def append_video_filter(ffmpeg_params, vf: str) -> list:
+    """Return ffmpeg_params with vf run after any -vf filter chain they already have."""
+    ffmpeg_params = list(ffmpeg_params)
+    if "-vf" in ffmpeg_params:
+        idx = ffmpeg_params.index("-vf") + 1
+        ffmpeg_params[idx] = f"{ffmpeg_params[idx]},{vf}"
+    else:
+        ffmpeg_params += ["-vf", vf]
+    return ffmpeg_params
+
+
+def stream_frames(frames, consume, depth: int = 8):
+    """Feed frames to consume(batch) on a helper thread through a bounded queue.
+
+    The frames iterator is advanced on the calling thread, so producing the next
+    frames overlaps with consuming the previous ones. Each consume() call gets every
+    frame queued since the last one (at least one, at most depth), in order.
+    Rendering stays on the caller because Numba's parallel thread pool hangs
+    interpreter exit when first started off the main thread. If consume() raises,
+    production stops and the error is re-raised here.
+    """
+    ready = queue.Queue(maxsize=depth)
+    failed = []
+
+    def run():
+        done = False
+        while not done:
+            batch = [ready.get()]
+            while not ready.empty():
+                batch.append(ready.get())
+            if batch[-1] is None:
+                done = True
+                batch.pop()
+            if failed or not batch:
+                continue  # Drain until the producer notices
+            try:
+                consume(batch)
+            except BaseException as e:
+                failed.append(e)
+
+    worker = threading.Thread(target=run, daemon=True)
+    worker.start()
+    try:
+        for frame in frames:
+            if failed:
+                break
+            ready.put(frame)
+    finally:
+        ready.put(None)
+        worker.join()
+    if failed:
+        raise failed[0]
+
+
+def write_all(fd: int, buffers):
+    """Write every buffer to fd, gathering them into as few writev() calls as possible."""
+    views = [memoryview(buffer) for buffer in buffers]
+    while views:
+        # os.writev is missing on Windows, write one buffer at a time there
+        written = os.writev(fd, views) if hasattr(os, "writev") else os.write(fd, views[0])
+        # Drop what went out, resume partway through a buffer after a short write
+        while views and written >= len(views[0]):
+            written -= len(views.pop(0))
+        if written:
+            views[0] = views[0][written:]
+
+
+def pipe_to_ffmpeg(
+    frames, output_path: str, fps: float, codec, ffmpeg_params, hold_frames: int = 0
+):
+    """Stream raw NV12 frames (bytes, one per frame) into an ffmpeg encoder process.
+
+    Frames are written from a helper thread (see stream_frames()), so frame
+    synthesis overlaps with ffmpeg consuming the pipe; whatever has queued up
+    meanwhile goes out in a single writev(). ffmpeg repeats the last
+    frame hold_frames more times on its own. Frames rendered below RESOLUTION are
+    upscaled by the encoder process, on the GPU for VAAPI.
+    """
+    if RENDER_RESOLUTION != RESOLUTION and codec.endswith("_vaapi"):
+        # Upload the small frames and let the GPU upscale them after hwupload
+        ffmpeg_params = append_video_filter(
+            ffmpeg_params, f"scale_vaapi={RESOLUTION[0]}:{RESOLUTION[1]}:mode=hq"
+        )
+    elif RENDER_RESOLUTION != RESOLUTION:
+        ffmpeg_params = prepend_video_filter(
+            ffmpeg_params, f"scale={RESOLUTION[0]}:{RESOLUTION[1]}:flags=neighbor"
+        )
+    if hold_frames:
+        ffmpeg_params = prepend_video_filter(
+            ffmpeg_params, f"tpad=stop_mode=clone:stop={hold_frames}"
+        )
+    cmd = [
+        FFMPEG_BINARY,
+        "-y",
+        "-loglevel",
+        "error",
+        "-f",
+        "rawvideo",
+        "-pix_fmt",
+        "nv12",
+        "-s",
+        f"{RENDER_RESOLUTION[0]}x{RENDER_RESOLUTION[1]}",
+        "-r",
+        str(fps),
+        "-i",
+        "-",
+        "-an",
+        "-c:v",
+        codec,
+        *ffmpeg_params,
+    ]
+    # libx264 takes NV12 as-is (it is x264's internal layout), no yuv420p conversion
+    cmd.append(output_path)
+
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        stream_frames(frames, lambda batch: write_all(proc.stdin.fileno(), batch))
+    except BrokenPipeError:
+        pass  # ffmpeg exited early, its stderr explains why
+    finally:
+        try:
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        stderr = proc.stderr.read().decode(errors="replace")
+        proc.wait()
+
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg exited with code {proc.returncode}: {stderr.strip()}")
+
+
+def encode_with_pyav(
+    frames, output_path: str, fps: float, codec, ffmpeg_params, hold_frames: int = 0
+):
+    """Encode raw NV12 frames (bytes, one per frame) in-process with PyAV.
+
+    ffmpeg_params are the ["-name", "value", ...] pairs from get_codec_config(),
+    passed to the codec as options. Frames go straight into libavcodec, without
+    an ffmpeg process or a pipe in between. Encoding runs on a helper thread (see
+    stream_frames()), overlapping frame synthesis. A frame repeating the previous
+    bytes object reuses its VideoFrame, and the last frame is encoded hold_frames
+    more times.
+    """
+    width, height = RENDER_RESOLUTION
+    container = av.open(output_path, "w")
+    try:
+        stream = container.add_stream(codec, rate=Fraction(fps).limit_denominator(1001))
+        stream.width, stream.height = RESOLUTION
+        stream.pix_fmt = "nv12"
+        stream.options = {
+            name.lstrip("-"): value for name, value in zip(ffmpeg_params[::2], ffmpeg_params[1::2])
         }
-        if char in corruption_map:
-            return random.choice(corruption_map[char])
+        last = [None, None]  # bytes, VideoFrame of the last frame encoded
+        pts = itertools.count()
+
+        def encode_frame(video_frame):
+            # The encoder takes its own reference, so a frame can be sent again with a new pts
+            video_frame.pts = next(pts)
+            container.mux(stream.encode(video_frame))
+
+        def encode(batch):
+            for frame in batch:
+                if frame is not last[0]:
+                    planes = np.frombuffer(frame, dtype=np.uint8).reshape(height * 3 // 2, width)
+                    video_frame = av.VideoFrame.from_ndarray(planes, format="nv12")
+                    if RENDER_RESOLUTION != RESOLUTION:
+                        video_frame = video_frame.reformat(*RESOLUTION, interpolation="POINT")
+                    last[:] = [frame, video_frame]
+                encode_frame(last[1])
+
+        stream_frames(frames, encode)
+        for _ in range(hold_frames if last[1] is not None else 0):
+            encode_frame(last[1])
+        container.mux(stream.encode())  # Flush delayed frames
+    finally:
+        container.close()
+
+
+def write_video(
+    frame_source, output_path: str, fps: float, use_gpu: bool = USE_GPU, hold_frames: int = 0
+):
+    """Encode the frames yielded by frame_source(), falling back to CPU if GPU encoding fails.
+
+    frame_source is called again for the CPU attempt, so it must restart from frame 0.
+    The last frame is held for hold_frames extra frames without being sent again.
+    The CPU encoder runs in-process through PyAV when it is installed. VAAPI needs a
+    hardware frames context PyAV does not set up, so the GPU always uses the ffmpeg pipe.
+    """
+
+    def encode(codec, ffmpeg_params):
+        source = frame_source()
+        frames = timed_frames(source)
+        try:
+            if HAVE_AV and not codec.endswith("_vaapi"):
+                encode_with_pyav(frames, output_path, fps, codec, ffmpeg_params, hold_frames)
+            else:
+                pipe_to_ffmpeg(frames, output_path, fps, codec, ffmpeg_params, hold_frames)
+        finally:
+            # Shut this attempt's frame pipeline (and any worker pool) down before a retry
+            if hasattr(source, "close"):
+                source.close()
+
+    try:
+        encode(*get_codec_config(use_gpu, pix_fmt="nv12", fps=fps))
+        return
+    except Exception as e:
+        if not use_gpu:
+            raise
+        # Only the message is kept: retrying inside the handler would keep the failed
+        # attempt's frames alive through the traceback for the whole CPU encode
+        error = str(e)
+    print(f"GPU encoding failed, falling back to CPU: {error}")
+    encode(*get_codec_config(use_gpu=False, pix_fmt="nv12", fps=fps))
+
+
+# Nanoseconds spent producing each frame, collected only while profile() runs
+_frame_times = None
+
+
+def timed_frames(frames):
+    """Pass frames through, recording how long each one took to produce while profiling."""
+    if _frame_times is None:
+        yield from frames
+        return
+    start = time.perf_counter_ns()
+    for frame in frames:
+        _frame_times.append(time.perf_counter_ns() - start)
+        yield frame
+        start = time.perf_counter_ns()
+
+
+def profile(func, top: int = 30):
+    """Run func() under cProfile, then print its top functions and per-frame times.
+
+    Only the calling process is profiled; frames rendered by pool workers show up
+    as time spent waiting on their results.
+    """
+    global _frame_times
+    _frame_times = []
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        func()
+    finally:
+        profiler.disable()
+        frame_times, _frame_times = _frame_times, None
+
+    pstats.Stats(profiler).sort_stats("cumulative").print_stats(top)
+    if frame_times:
+        print(
+            f"Frames: {len(frame_times)}, "
+            f"mean {statistics.mean(frame_times) / 1e6:.2f} ms, "
+            f"median {statistics.median(frame_times) / 1e6:.2f} ms"
+        )
+
+
+def render_text_video(
+    frame_specs, output_path: str, fps: float, colors=(TEXT_COLOR,), progress=None
+):
+    """Render (text, colors) frame specs with the glyph sprite renderer and encode them.
+
+    colors lists every color the specs use; each glyph is rasterized once per color.
+    A run of identical frames at the end (e.g. a timer parked at 00:00) is rendered
+    once and repeated by the encoder. progress, if given, is called as
+    progress(done, total) for each frame handed to the encoder.
+    """
+    # Every glyph is rasterized once, frames are then composited from the tiles
+    char_widths, sprites = load_glyph_sprites(FONT_SIZE // RENDER_DOWNSCALE, tuple(colors))
+
+    hold_frames = 0
+    while hold_frames + 1 < len(frame_specs) and frame_specs[-hold_frames - 2] == frame_specs[-1]:
+        hold_frames += 1
+    frame_specs = frame_specs[: len(frame_specs) - hold_frames]
+
+    def frame_source():
+        frames = render_text_frames(frame_specs, char_widths, sprites)
+        if progress is None:
+            yield from frames
+            return
+        total = len(frame_specs) + hold_frames
+        for done, frame in enumerate(frames, 1):
+            progress(done, total)
+            yield frame
+        progress(total, total)
+
+    write_video(
+        frame_source,
+        output_path,
+        fps,
+        hold_frames=hold_frames,
+    )
+
+
+def _ass_time(centis: int) -> str:
+    """Format centiseconds as an ASS timestamp (H:MM:SS.cc)."""
+    secs, cs = divmod(centis, 100)
+    mins, secs = divmod(secs, 60)
+    return f"{mins // 60}:{mins % 60:02d}:{secs:02d}.{cs:02d}"
+
+
+def write_subtitle_script(path, frame_strs, fps: float, font):
+    """Write an ASS script showing frame_strs[i] centered on frame i.
+
+    Runs of equal strings become one event. Event starts are rounded down to the
+    centisecond so they never land after the frame they belong to.
+    """
+    family, style = font.getname()
+    ascent, descent = font.getmetrics()  # libass sizes fonts by ascent + descent
+    r, g, b = ImageColor.getrgb(TEXT_COLOR)
+    lines = [
+        "[Script Info]",
+        "ScriptType: v4.00+",
+        f"PlayResX: {RESOLUTION[0]}",
+        f"PlayResY: {RESOLUTION[1]}",
+        "",
+        "[V4+ Styles]",
+        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, "
+        "BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, "
+        "BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding",
+        f"Style: Timer,{family},{ascent + descent},&H00{b:02X}{g:02X}{r:02X},&H00000000,"
+        f"&H00000000,&H00000000,{-1 if 'Bold' in style else 0},0,0,0,100,100,0,0,1,0,0,5,0,0,0,1",
+        "",
+        "[Events]",
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+    ]
+    start = 0
+    for idx in range(1, len(frame_strs) + 1):
+        if idx == len(frame_strs) or frame_strs[idx] != frame_strs[start]:
+            begin, end = int(start * 100 // fps), int(idx * 100 // fps)
+            lines.append(
+                f"Dialogue: 0,{_ass_time(begin)},{_ass_time(end)},Timer,,0,0,0,,{frame_strs[start]}"
+            )
+            start = idx
+    Path(path).write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def write_subtitle_video(frame_strs, output_path: str, fps: float, font, use_gpu: bool = USE_GPU):
+    """Let ffmpeg draw frame_strs with libass over a generated background and encode it.
+
+    Python produces no frames at all; font must be a TrueType font loaded from a file.
+    Falls back to CPU encoding if GPU encoding fails.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        # The script and its font side by side, so filter arguments need no escaping
+        shutil.copy(font.path, tmp)
+        write_subtitle_script(Path(tmp) / "timer.ass", frame_strs, fps, font)
+        subtitles = f"ass={tmp}/timer.ass:fontsdir={tmp}"
+        background = "color=c=0x{:02x}{:02x}{:02x}:s={}x{}:r={}".format(
+            *BACKGROUND_RGB, RESOLUTION[0], RESOLUTION[1], fps
+        )
+
+        for gpu in (True, False) if use_gpu else (False,):
+            codec, ffmpeg_params = get_codec_config(gpu, fps=fps)
+            ffmpeg_params = prepend_video_filter(ffmpeg_params, subtitles)
+            if codec == "libx264":
+                ffmpeg_params += ["-pix_fmt", "yuv420p"]
+            cmd = [
+                FFMPEG_BINARY,
+                "-y",
+                "-loglevel",
+                "error",
+                "-f",
+                "lavfi",
+                "-i",
+                background,
+                "-frames:v",
+                str(len(frame_strs)),
+                "-an",
+                "-c:v",
+                codec,
+                *ffmpeg_params,
+                output_path,
+            ]
+            proc = subprocess.run(cmd, stderr=subprocess.PIPE)
+            if proc.returncode == 0:
+                return
+            stderr = proc.stderr.decode(errors="replace").strip()
+            error = f"ffmpeg exited with code {proc.returncode}: {stderr}"
+            if not gpu:
+                raise RuntimeError(error)
+            print(f"GPU encoding failed, falling back to CPU: {error}")
+
+
+# Look-alike replacements used by the digit corruption glitch
+CORRUPTION_MAP = {
+    "0": ["O", "0", "D"],
+    "1": ["I", "1", "|", "l"],
+    "2": ["Z", "2", "z"],
+    "3": ["3", "E"],
+    "4": ["4", "A"],
+    "5": ["S", "5", "s"],
+    "6": ["6", "G", "b"],
+    "7": ["7", "T"],
+    "8": ["8", "B"],
+    "9": ["9", "g", "q"],
+    ":": [":", ";"],
+}
+
+
+def corrupt_digit(
+    char: str, corruption_chance: float = 0.997, roll: float = None, choice: int = None
+) -> str:
+    """Randomly corrupt a digit to look glitchy.
+
+    roll (0-1) and choice (any non-negative int) can be drawn in bulk beforehand
+    to skip the per-call random draws.
+    """
+    if roll is None:
+        roll = random.random()
+    if roll > corruption_chance and char in CORRUPTION_MAP:
+        options = CORRUPTION_MAP[char]
+        if choice is None:
+            return random.choice(options)
+        return options[choice % len(options)]
     return char
 
 
+# Text as glyph codes: indices into TEXT_CHARS (the blank used by animations last)
+TEXT_CHARS = GLYPHS + " "
+CORRUPTION_CHOICES = 12  # lcm of the option counts, so choice % len(options) stays uniform
+
+# CORRUPTION_TABLE[code, choice] -> corrupted code, identity for uncorruptible chars
+CORRUPTION_TABLE = np.repeat(
+    np.arange(len(TEXT_CHARS), dtype=np.int8)[:, None], CORRUPTION_CHOICES, axis=1
+)
+for _char, _options in CORRUPTION_MAP.items():
+    CORRUPTION_TABLE[TEXT_CHARS.index(_char)] = [
+        TEXT_CHARS.index(_options[k % len(_options)]) for k in range(CORRUPTION_CHOICES)
+    ]
+del _char, _options
+
+
+def encode_text(strs) -> np.ndarray:
+    """Convert equal-length strings into an array of glyph codes, one row per string."""
+    return np.array([[TEXT_CHARS.index(c) for c in text] for text in strs], dtype=np.int8)
+
+
+def decode_text(codes: np.ndarray) -> list:
+    """Convert rows of glyph codes back into strings."""
+    return ["".join(TEXT_CHARS[code] for code in row) for row in codes.tolist()]
+
+
+def corrupt_codes(
+    codes: np.ndarray, rolls: np.ndarray, choices: np.ndarray, corruption_chance: float = 0.997
+) -> np.ndarray:
+    """Vectorized corrupt_digit over glyph codes with pre-drawn rolls and choices."""
+    return np.where(rolls > corruption_chance, CORRUPTION_TABLE[codes, choices], codes)
+
+
+@njit(cache=True)
+def apply_corruption(frame_times, codes, candidates, durations):
+    """Apply persistent digit corruption to the clean glyph codes of every frame.
+
+    candidates[idx] is the glyph each position would switch to on frame idx and
+    durations[idx] how long it would last. A position with active corruption keeps
+    it, the others may pick up a new one. Returns the corrupted codes.
+    """
+    n_frames, n_chars = codes.shape
+    out = codes.copy()
+
+    # Per-position corruption state: corrupted glyph code and expiry time.
+    # An expiry in the past means the position is clean.
+    corrupt_glyph = np.zeros(n_chars, dtype=codes.dtype)
+    corrupt_expiry = np.zeros(n_chars)
+
+    for idx in range(n_frames):
+        t = frame_times[idx]
+        for i in range(n_chars):
+            if t < corrupt_expiry[i]:
+                # Use existing corruption
+                out[idx, i] = corrupt_glyph[i]
+            elif candidates[idx, i] != codes[idx, i]:
+                # New corruption created, store it with expiry time
+                corrupt_glyph[i] = candidates[idx, i]
+                corrupt_expiry[i] = t + durations[idx, i]
+                out[idx, i] = corrupt_glyph[i]
+
+    return out
+
+
+# Speed zones of the weird timer as (low, high, speed), bounds exclusive and sorted.
+# Outside every zone the speed follows a slow sine.
+_WEIRD_ZONES = np.array(
+    [
+        (0.12, 0.22, -2.0),  # Long reverse zones (very noticeable)
+        (0.25, 0.32, 0.15),  # Dramatic slow motion
+        (0.35, 0.45, -3.5),
+        (0.52, 0.58, 0.1),
+        (0.60, 0.66, 5.0),  # Hyper speed
+        (0.68, 0.75, -4.0),
+        (0.82, np.inf, 6.0),
+    ]
+)
+_WEIRD_ZONE_LO, _WEIRD_ZONE_HI, _WEIRD_ZONE_SPEED = (
+    np.ascontiguousarray(column) for column in _WEIRD_ZONES.T
+)
+
+
+@njit("float64(float64, float64)", cache=True, fastmath=True)
 def calculate_weird_time(t: float, duration: float) -> float:
     """Calculate display time with weird speed variations and reversals."""
     progress = t / duration
 
+    # The only zone that can hold progress is the first one ending after it
+    idx = np.searchsorted(_WEIRD_ZONE_HI, progress, side="right")
+    if _WEIRD_ZONE_LO[idx] < progress:
+        return _WEIRD_ZONE_SPEED[idx]
+
     # Base speed with dramatic variations
-    speed_variation = 1.0 + 1.2 * math.sin(progress * math.pi * 3)
-
-    # Long reverse zones (very noticeable)
-    if 0.12 < progress < 0.22:
-        speed_variation = -2.0
-    elif 0.35 < progress < 0.45:
-        speed_variation = -3.5
-    elif 0.68 < progress < 0.75:
-        speed_variation = -4.0
-    # Dramatic slow motion zones
-    elif 0.25 < progress < 0.32:
-        speed_variation = 0.15
-    elif 0.52 < progress < 0.58:
-        speed_variation = 0.1
-    # Hyper speed zones
-    elif 0.60 < progress < 0.66:
-        speed_variation = 5.0
-    elif progress > 0.82:
-        speed_variation = 6.0
-
-    return speed_variation
+    return 1.0 + 1.2 * math.sin(progress * math.pi * 3)
+
+
+def calculate_weird_time_vec(t: np.ndarray, duration: float) -> np.ndarray:
+    """Vectorized calculate_weird_time over an array of timestamps."""
+    progress = np.asarray(t, dtype=np.float64) / duration
+    base = 1.0 + 1.2 * np.sin(progress * math.pi * 3)
+
+    # Same zone lookup as the scalar version, for every timestamp at once
+    idx = np.searchsorted(_WEIRD_ZONE_HI, progress, side="right")
+    return np.where(_WEIRD_ZONE_LO[idx] < progress, _WEIRD_ZONE_SPEED[idx], base)